@@ -9,6 +9,8 @@ class FemaleAgent(BaseAgent):
     Can be queried from outside
     """
 
+    __slots__ = ('nest_ids', '_male_count', 'home_range', '_owned_nests_tuple')
+
     def __init__(
             self,
             id: int,
@@ -26,13 +28,25 @@ class FemaleAgent(BaseAgent):
         """
         super().__init__(id, position)
         self.nest_ids: Set[int] = set()
+        # Cached tuple view of nest_ids, rebuilt lazily after add_nest;
+        # lets the allocation path avoid a list() copy on every call
+        self._owned_nests_tuple: Tuple[int, ...] = ()
         self._male_count = initial_male_count
         # TODO: home_range is not used in core simulation logic, consider removing or integrating
         self.home_range: Set[Tuple[int, int]] = set()
 
+    def add_nest(self, nest_id: int) -> None:
+        """Associate a nest with this female, keeping the cached tuple fresh."""
+        self.nest_ids.add(nest_id)
+        self._owned_nests_tuple = tuple(self.nest_ids)
+
+    def get_owned_nests(self) -> Tuple[int, ...]:
+        """Return the female's nest IDs as a reusable tuple (do not mutate)."""
+        return self._owned_nests_tuple
+
     def get_home_range(self) -> Set[Tuple[int, int]]:
-        """Return female home range cells."""
-        return self.home_range.copy()  # Return copy to prevent external mutation
+        """Return female home range cells (read-only; do not mutate)."""
+        return self.home_range
     
     def get_male_count(self) -> int:
         """
@@ -1,5 +1,6 @@
 # agents/male_agent.py
-from typing import Tuple, Dict, Optional, Set
+from types import MappingProxyType
+from typing import Tuple, Dict, KeysView, Mapping, Optional
 from core.base_agent import BaseAgent
 
 class MaleAgent(BaseAgent):
@@ -8,7 +9,9 @@ class MaleAgent(BaseAgent):
     Encapsulates state only - all decision logic is in MaleStrategy.
     Can be queried from outside
     """
-    
+
+    __slots__ = ('_nest_roles', '_nest_roles_view')
+
     def __init__(
             self,
             id: int,
@@ -28,16 +31,19 @@ class MaleAgent(BaseAgent):
         super().__init__(id, position)
         self._nest_roles = {k: v for k, v in (nest_roles or {}).items() 
                    if v in ["alpha", "beta"]}
+        # Read-only proxy shared by all nest_roles reads; tracks the backing
+        # dict without copying it on every access
+        self._nest_roles_view: Mapping[int, str] = MappingProxyType(self._nest_roles)
 
     @property
-    def nest_roles(self) -> Dict[int, str]:
-        """Read-only access to nest roles."""
-        return self._nest_roles.copy()  # Return copy to prevent external mutation
+    def nest_roles(self) -> Mapping[int, str]:
+        """Read-only view of nest roles (do not mutate; use assign/unassign)."""
+        return self._nest_roles_view
     
     @property
-    def nest_ids(self) -> Set[int]:
-        """Return set of nest IDs where male currently provides raising_share."""
-        return set(self._nest_roles.keys())
+    def nest_ids(self) -> KeysView[int]:
+        """Read-only view of nest IDs where male currently provides raising_share."""
+        return self._nest_roles.keys()
     
     def get_nest_role(self, nest_id: int) -> Optional[str]:
         """
@@ -1,4 +1,6 @@
 # agents/nest.py
+import numpy as np
+from numpy.typing import NDArray
 from typing import Dict, Set, Tuple, Optional
 
 # Use string forward reference to avoid circular import
@@ -10,20 +12,25 @@ if TYPE_CHECKING:
 # TODO: modify the home_range_cells to better accommodate the home range of the female.
 class Nest:
     """Single breeding nest owned by one female."""
-    
+
+    __slots__ = ('id', 'female_id', 'position', 'home_range_cells', 'resource_cache',
+                 '_male_ids', 'male_raising_shares', 'female_raising_share',
+                 '_male_share_total')
+
     def __init__(self, id: int, female_id: Optional[int], position: Tuple[int, int]):
         """
         Args:
             id: Nest unique ID (exposed to agents)
             female_id: The sole owner of this nest (None if no female assigned)
             position: (x, y) grid coordinates where nest is located
-            home_range_cells: Set of (x, y) grid coordinates that define the nest's home range
+            home_range_cells: Encoded flat cell indices (see world_state.encode_cell)
+                that define the nest's home range
         """
         self.id = id
         self.female_id = female_id
         self.position = position
         # TODO: home_range_cells is not used in core simulation logic, only for reporting. Consider removing or integrating
-        self.home_range_cells: Set[Tuple[int, int]] = set()
+        self.home_range_cells: NDArray[np.int64] = np.empty(0, dtype=np.int64)
         self.resource_cache: float = 0.0  # Current step's available resources
 
         # Males in the current nest
@@ -33,10 +40,14 @@ class Nest:
         # Key: male_id, Value: raising share (must sum to ≤ 1.0 across all males)
         self.male_raising_shares: Dict[int, float] = {}
         self.female_raising_share: float = 0.0
+        # Running sum of male_raising_shares, maintained by
+        # set_male_raising_share so fitness queries avoid re-summing the dict
+        self._male_share_total: float = 0.0
     
     @property
     def get_male_ids(self) -> Set[int]:
-        return self._male_ids.copy()
+        """Read-only access to male IDs (do not mutate; use add/remove_male)."""
+        return self._male_ids
     
     def add_male(self, male_id: int) -> None:
         if male_id not in self._male_ids:
@@ -51,13 +62,29 @@ class Nest:
         Called by: calculate_male_fitness()
         """
         return self.male_raising_shares.get(male_id, 0.0)
-    
+
+    def set_male_raising_share(self, male_id: int, share: float) -> None:
+        """
+        Set the raising share for a specific male, keeping the running
+        total in sync. All writers must go through this method.
+
+        Args:
+            male_id: The male agent's ID
+            share: The new raising share for that male
+        """
+        self._male_share_total += share - self.male_raising_shares.get(male_id, 0.0)
+        self.male_raising_shares[male_id] = share
+
+    def del_male_raising_share(self, male_id: int) -> None:
+        """Remove a male's raising share, keeping the running total in sync."""
+        self._male_share_total -= self.male_raising_shares.pop(male_id, 0.0)
+
     def get_male_raising_share(self) -> float:
         """
         Get the total raising share of all males.
         Called by: calculate_male_fitness()
         """
-        return sum(self.male_raising_shares.values())
+        return self._male_share_total
     
     def get_total_raising_share(self) -> float:
         """
@@ -66,9 +93,27 @@ class Nest:
         """
         return self.female_raising_share + self.get_male_raising_share()
     
-    def get_home_range(self) -> Set[Tuple[int, int]]:
-        """Return nest home range cells."""
-        return self.home_range_cells.copy()  # Return copy to prevent external mutation
+    def get_home_range(self) -> NDArray[np.int64]:
+        """Return nest home range cells as encoded flat indices (read-only view)."""
+        return self.home_range_cells
+
+    def contains_cell(self, x: int, y: int, radius: int) -> bool:
+        """
+        O(1) home-range containment test.
+
+        The home range is the square window of the given radius around the
+        nest (clipped to grid bounds by construction), so membership is pure
+        arithmetic — no per-cell set, hash, or bitmap storage is needed.
+
+        Args:
+            x, y: Grid coordinates to test (assumed in bounds)
+            radius: Home range radius (see config.HOME_RANGE_RADIUS)
+
+        Returns:
+            True if (x, y) lies within the nest's home range
+        """
+        nx, ny = self.position
+        return abs(x - nx) <= radius and abs(y - ny) <= radius
     
     def get_total_resources(self, world_state: 'WorldState') -> float:
         """
@@ -82,12 +127,21 @@ class Nest:
         Returns:
             Total resources in the nest's home range
         """
-        total_resources = 0.0
-        
-        # Sum resources from all cells in the home range
-        for cell in self.home_range_cells:
-            total_resources += world_state.get_resource_density(cell)
-        
+        # Memoized per step on the world state; the grid does not change
+        # between resource resets, so the sum is stable within a step
+        cached = world_state._nest_resource_cache.get(self.id)
+        if cached is not None:
+            return cached
+
+        # Sum resources from all cells in the home range in one gather,
+        # indexing the grid directly to skip the per-call helper dispatch
+        grid = world_state.resource_grid
+        if grid is None:
+            total_resources = 0.0
+        else:
+            total_resources = float(grid.ravel()[self.home_range_cells].sum())
+
+        world_state._nest_resource_cache[self.id] = total_resources
         return total_resources
     
     def add_resources(self, amount: float) -> None:
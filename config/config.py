@@ -3,6 +3,7 @@
 
 # Global parameters
 RANDOM_SEED = 42  # Random seed for reproducibility
+LOG_LEVEL = "WARNING"  # Debug-log level; "INFO" records every agent's daily allocation (slow)
 
 # World parameters (for world/world_generator.py)
 GRID_SIZE = 500  # grid size for the world, unchanged
@@ -33,6 +34,7 @@ LOOP_ROUND = 10  # number of days to run the simulation
 # Raising share allocation parameters (for greedy iterative allocation algorithm)
 MARGINAL_DELTA = 0.01  # Step size for numerical differentiation (marginal utility calculation)
 ALLOCATION_STEPS = 20  # Number of steps for greedy iterative allocation algorithm
+ALLOCATION_WORKERS = 1  # Threads for strategy collection; 1 = sequential (deterministic)
 
 # Belief system parameters
 SEARCH_BELIEF_PRIOR_ALPHA = 1.0
@@ -11,6 +11,8 @@ class BaseAgent(ABC):
     Defines the minimal interface that all agents must implement.
     """
 
+    __slots__ = ('_id', '_position', 'search_share')
+
     def __init__(self, id: int, position: Tuple[int, int]):
         """
         Initialize base agent with immutable ID and mutable position.
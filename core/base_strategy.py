@@ -1,7 +1,8 @@
 # core/base_strategy.py
 from abc import ABC, abstractmethod
 from typing import Dict, Any, TYPE_CHECKING, Callable, List
-from config.config import ALLOCATION_STEPS, MARGINAL_DELTA
+import numpy as np
+from config.config import ALLOCATION_STEPS
 
 
 # TODO: this is hard to comprehend
@@ -94,89 +95,58 @@ class BaseStrategy(ABC):
                                 agent_id: int, 
                                 available_nests: List[int], 
                                 total_raising_share: float, 
-                                belief_func: Callable[[int], float], 
-                                fitness_func: Callable[[float, float, tuple, 'WorldState'], float], 
+                                marginal_utility_func: Callable[[float, float, tuple, 'WorldState'], float],
                                 world_state: 'WorldState') -> Dict[int, float]:
         """
         General greedy iterative allocation algorithm for raising shares.
-        
+
+        Beliefs about others' raising shares are fetched from the belief
+        system in one batched call rather than per nest.
+
         Args:
             agent_id: The agent's ID
             available_nests: List of nest IDs available to the agent
             total_raising_share: Total raising share to allocate across nests
-            belief_func: Function to get beliefs about others' raising shares for a nest
-            fitness_func: Counterfactual fitness calculation function
+            marginal_utility_func: Counterfactual marginal utility function
             world_state: Current world state
-            
+
         Returns:
             Dictionary mapping nest IDs to allocated raising shares
         """
         num_nests = len(available_nests)
-        
-        # Initialize allocation for all nests to 0
-        raising_shares = {nest_id: 0.0 for nest_id in available_nests}
-        
+
+        # Pack per-nest state into arrays once so the inner scan runs over
+        # contiguous data instead of dict lookups per step
+        shares = np.zeros(num_nests)
+        others_total = self.belief_system.get_raising_beliefs_batch(agent_id, available_nests)
+        nest_positions = [world_state.nests[nest_id].position for nest_id in available_nests]
+        marginal_utilities = np.empty(num_nests)
+
         # Calculate step size: total_raising_share / number of allocation steps
         step_size = total_raising_share / ALLOCATION_STEPS
-        
-        # Get beliefs about others' raising shares in each nest
-        others_total = {nest_id: belief_func(nest_id) for nest_id in available_nests}
-        
+
         # Iterate for the specified number of steps
         for _ in range(ALLOCATION_STEPS):
             # Calculate marginal utility for each nest
-            marginal_utilities = {}
-            
-            for nest_id in available_nests:
-                # Get current allocation for this nest
-                current_allocation = raising_shares[nest_id]
-                
-                # Get nest information
-                nest = world_state.nests[nest_id]
-                nest_position = nest.position
-                
-                # Get others' total raising share for this nest from beliefs
-                others_raising = others_total.get(nest_id, 0.0)
-                
-                # Calculate base fitness using counterfactual function
-                base_fitness: float = fitness_func(
-                    my_raise=current_allocation,
-                    others_raise=others_raising,
-                    nest_position=nest_position,
+            for i in range(num_nests):
+                marginal_utilities[i] = marginal_utility_func(
+                    my_raise=shares[i],
+                    others_raise=others_total[i],
+                    nest_position=nest_positions[i],
                     world_state=world_state
                 )
-                
-                # Calculate fitness with increment using counterfactual function
-                increment_fitness = fitness_func(
-                    my_raise=current_allocation + MARGINAL_DELTA,
-                    others_raise=others_raising,
-                    nest_position=nest_position,
-                    world_state=world_state
-                )
-                
-                # Calculate marginal utility using numerical differentiation
-                if MARGINAL_DELTA > 0:
-                    marginal_utility = (increment_fitness - base_fitness) / MARGINAL_DELTA
-                else:
-                    marginal_utility = 0.0
-                
-                marginal_utilities[nest_id] = marginal_utility
-            
-            # Find the nest with the highest marginal utility
-            if marginal_utilities:
-                best_nest_id = max(marginal_utilities, key=marginal_utilities.get)
-                
-                # Add a step of raising share to this nest
-                raising_shares[best_nest_id] += step_size
-        
+
+            # Add a step of raising share to the nest with the highest
+            # marginal utility
+            if num_nests > 0:
+                shares[int(marginal_utilities.argmax())] += step_size
+
         # Step 3: Normalize to ensure strict budget constraint
-        actual_total = sum(raising_shares.values())
+        actual_total = shares.sum()
         if actual_total > 0:
-            scaling_factor = total_raising_share / actual_total
-            raising_shares = {nest_id: share * scaling_factor for nest_id, share in raising_shares.items()}
+            shares *= total_raising_share / actual_total
         else:
             # Fallback to equal distribution if all marginal utilities are zero
-            share_per_nest = total_raising_share / num_nests
-            raising_shares = {nest_id: share_per_nest for nest_id in available_nests}
-        
-        return raising_shares
\ No newline at end of file
+            shares[:] = total_raising_share / num_nests
+
+        return {nest_id: float(share) for nest_id, share in zip(available_nests, shares)}
\ No newline at end of file
@@ -1,9 +1,40 @@
 # core/fitness.py
 import agents.nest as nest
 import math
-from typing import Tuple, Set, Optional
+import numpy as np
+from numpy.typing import NDArray
+from typing import Dict, Tuple, Optional
 from world.world_state import WorldState
-from config.config import RESOURCE_EXTRACTION_RATE, HOME_RANGE_RADIUS, LOGISTIC_K, LOGISTIC_A, LOGISTIC_R
+from config.config import RESOURCE_EXTRACTION_RATE, HOME_RANGE_RADIUS, LOGISTIC_K, LOGISTIC_A, LOGISTIC_R, MARGINAL_DELTA
+
+# Precomputed circular masks for exploration areas, keyed by effective radius.
+# Each entry is a pair of (dx, dy) offset arrays for the cells within the
+# radius, presplit so the hot path (mine_resources / counterfactual fitness)
+# never rebuilds or reslices the disk.
+_DISK_OFFSETS: Dict[int, Tuple[NDArray[np.int32], NDArray[np.int32]]] = {}
+
+
+def _disk_offsets(radius: int) -> Tuple[NDArray[np.int32], NDArray[np.int32]]:
+    """
+    Return the (dx, dy) offset arrays of all cells within `radius`,
+    precomputed and cached per radius. Radii above HOME_RANGE_RADIUS can
+    occur in counterfactual queries (total investment may exceed 1.0), so
+    entries are built lazily on first use.
+    """
+    offsets = _DISK_OFFSETS.get(radius)
+    if offsets is None:
+        coords = np.arange(-radius, radius + 1, dtype=np.int32)
+        squares = coords * coords
+        mask = squares[:, None] + squares[None, :] <= radius * radius
+        dx, dy = np.nonzero(mask)
+        offsets = (coords[dx], coords[dy])
+        _DISK_OFFSETS[radius] = offsets
+    return offsets
+
+
+# Warm the cache for the radii reachable from a unit raising share
+for _radius in range(1, HOME_RANGE_RADIUS + 1):
+    _disk_offsets(_radius)
 
 def calculate_female_fitness(nest: nest.Nest, world_state: WorldState) -> float:
     """
@@ -19,6 +50,27 @@ def calculate_female_fitness(nest: nest.Nest, world_state: WorldState) -> float:
     # payoff is just the number of surviving fledglings
     return resource_to_fledglings(nest.get_total_resources(world_state))
 
+def calculate_female_fitness_batch(nest_ids: 'list[int]', world_state: WorldState) -> NDArray[np.float64]:
+    """
+    Vectorized calculate_female_fitness over many nests at once.
+
+    Resource totals are gathered per nest (hitting the per-step memo on the
+    world state) and pushed through the logistic as a single array
+    expression instead of one math.exp call per nest.
+
+    Args:
+        nest_ids: IDs of the nests to evaluate
+        world_state: The current world state
+
+    Returns:
+        Array of fitness values, one per nest in nest_ids order
+    """
+    total_resources = np.fromiter(
+        (world_state.nests[nest_id].get_total_resources(world_state) for nest_id in nest_ids),
+        dtype=np.float64, count=len(nest_ids))
+    return resource_to_fledglings_vec(total_resources)
+
+
 def calculate_male_fitness(nest: nest.Nest, male_id: int, world_state: WorldState) -> float:
     """
     Calculate the fitness of a male agent in a nest.
@@ -41,19 +93,70 @@ def calculate_male_fitness(nest: nest.Nest, male_id: int, world_state: WorldStat
     paternity_share = nest.male_raising_share(male_id) / total_male_share
     return resource_to_fledglings(nest.get_total_resources(world_state)) * paternity_share
 
+# Quantized lookup table for the scalar logistic. Beyond _LUT_MAX the
+# exponential term is below float noise and the curve is flat at K, so
+# out-of-range totals clamp to the last entry.
+_LUT_N = 4096
+_LUT_MAX = max(math.log(max(LOGISTIC_A, 1e-12) / 1e-9) / LOGISTIC_R, 1.0)
+_LUT_STEP = _LUT_MAX / _LUT_N
+_FLEDGLING_LUT = LOGISTIC_K / (
+    1.0 + LOGISTIC_A * np.exp(-np.arange(_LUT_N + 1) * _LUT_STEP * LOGISTIC_R))
+
+# Fledgling yield of the zero-resource branch; hit whenever an exploration
+# area holds no resources, so skip even the table lookup there
+_FLEDGLINGS_AT_ZERO = LOGISTIC_K / (1.0 + LOGISTIC_A)
+
+
 def resource_to_fledglings(total_resources: float) -> float:
     """
     Convert total resources to the number of expected surviving fledglings.
-    
+
+    Looks up a precomputed table quantized to _LUT_STEP resources per bucket
+    instead of evaluating math.exp on the hot path; use
+    resource_to_fledglings_exact when full precision matters.
+
     Args:
         total_resources: The total resources available for the nest.
-        
+
+    Returns:
+        The number of expected surviving fledglings
+    """
+    index = int(total_resources / _LUT_STEP)
+    if index >= _LUT_N:
+        index = _LUT_N
+    return float(_FLEDGLING_LUT[index])
+
+
+def resource_to_fledglings_exact(total_resources: float) -> float:
+    """
+    Exact (unquantized) form of resource_to_fledglings, kept for validation
+    of the lookup table.
+
+    Args:
+        total_resources: The total resources available for the nest.
+
     Returns:
         The number of expected surviving fledglings
     """
     return LOGISTIC_K / (1 + LOGISTIC_A * math.exp(- total_resources * LOGISTIC_R))
 
 
+def resource_to_fledglings_vec(total_resources: NDArray[np.float64]) -> NDArray[np.float64]:
+    """
+    Vectorized resource_to_fledglings over an array of resource totals.
+
+    Evaluates the logistic as one fused array expression, so batched fitness
+    paths get SIMD exp instead of one math.exp call per nest.
+
+    Args:
+        total_resources: Array of total resources, one per nest
+
+    Returns:
+        Array of expected surviving fledgling counts
+    """
+    return LOGISTIC_K / (1.0 + LOGISTIC_A * np.exp(-total_resources * LOGISTIC_R))
+
+
 def mine_resources(world_state: WorldState, nest_id: int, raising_share: float) -> float:
     """
     Main function to mine resources based on raising_share.
@@ -67,81 +170,83 @@ def mine_resources(world_state: WorldState, nest_id: int, raising_share: float)
         The amount of resources mined
     """
     nest = world_state.nests[nest_id]
-    
+
     # Step 1: Determine exploration area
-    home_range = determine_exploration_area(world_state, nest.position, raising_share)
-    
-    # Step 2: Select target patch with maximum resource density
-    target_pos = select_target_patch(world_state, home_range)
-    
-    # Step 3: Extract resources if target found
-    if target_pos:
-        extracted = extract_resources(world_state, target_pos)
+    xs, ys = determine_exploration_area(world_state, nest.position, raising_share)
+
+    # Step 2+3: Scan for the best patch and extract from it in one pass
+    extracted = _scan_and_extract(world_state, xs, ys)
+    if extracted > 0.0:
         nest.add_resources(extracted)
-        return extracted
-    return 0.0
+    return extracted
 
 
-def determine_exploration_area(world_state: WorldState, nest_position: Tuple[int, int], raising_share: float) -> Set[Tuple[int, int]]:
+def _effective_radius(raising_share: float) -> int:
+    """
+    Effective exploration radius for a given total raising investment.
+
+    The more resources invested in raising (higher raising_share), the larger
+    the exploration area. Even with very small raising_share, the agent still
+    explores at least a 1-cell radius (the immediate surrounding area).
+    """
+    return max(int(HOME_RANGE_RADIUS * raising_share), 1)
+
+
+def determine_exploration_area(world_state: WorldState, nest_position: Tuple[int, int], raising_share: float) -> Tuple[NDArray[np.int32], NDArray[np.int32]]:
     """
     Determine exploration area based on raising_share and home range radius.
-    
+
     Args:
         world_state: The current world state
         nest_position: The position of the nest
         raising_share: The raising share (0.0-1.0)
-        
+
     Returns:
-        Set of cells in the exploration area
+        Pair of (xs, ys) index arrays for the cells in the exploration area,
+        suitable for direct fancy indexing into the resource grid
     """
-    # Calculate effective exploration radius based on raising_share
-    # The more resources invested in raising (higher raising_share), the larger the exploration area
-    base_radius = HOME_RANGE_RADIUS * raising_share  # Continuous value radius
-    effective_radius = int(base_radius)  # Convert to integer grid cells
-    
-    # Ensure minimum exploration area: even with very small raising_share, the agent
-    # will still explore at least a 1-cell radius (the immediate surrounding area)
-    effective_radius = max(effective_radius, 1)
-    
+    effective_radius = _effective_radius(raising_share)
+
     x, y = nest_position
-    home_range: set[Tuple[int, int]] = set()
-    
-    # Add all cells within effective radius
-    for dx in range(-effective_radius, effective_radius + 1):
-        for dy in range(-effective_radius, effective_radius + 1):
-            if dx*dx + dy*dy <= effective_radius*effective_radius:
-                cell_x, cell_y = x + dx, y + dy
-                if 0 <= cell_x < world_state.grid_size and 0 <= cell_y < world_state.grid_size:
-                    home_range.add((cell_x, cell_y))
-    
-    return home_range
+    grid_size = world_state.grid_size
+    dxs, dys = _disk_offsets(effective_radius)
+
+    # Fast path: the whole disk is in bounds, so skip the clipping mask
+    # entirely (the common case for interior nests)
+    if (effective_radius <= x < grid_size - effective_radius
+            and effective_radius <= y < grid_size - effective_radius):
+        return dxs + x, dys + y
 
+    # Translate the precomputed disk to the nest position and clip to grid
+    # bounds in a single vectorized pass
+    xs = dxs + x
+    ys = dys + y
+    in_bounds = (xs >= 0) & (xs < grid_size) & (ys >= 0) & (ys < grid_size)
+    return xs[in_bounds], ys[in_bounds]
 
-def select_target_patch(world_state: WorldState, home_range: Set[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+
+def select_target_patch(world_state: WorldState, xs: NDArray[np.int32], ys: NDArray[np.int32]) -> Optional[Tuple[int, int]]:
     """
     Select the target patch with maximum resource density in the exploration area.
-    
+
     Args:
         world_state: The current world state
-        home_range: The set of cells in the exploration area
-        
+        xs: X indices of the cells in the exploration area
+        ys: Y indices of the cells in the exploration area
+
     Returns:
         The position of the target patch, or None if no valid cells
     """
-    if not home_range or world_state.resource_grid is None:
+    if xs.size == 0 or world_state.resource_grid is None:
         return None
-    
-    # Find cell with maximum resource density
-    max_density = -1.0
-    target_pos = None
-    
-    for cell in home_range:
-        density = world_state.get_resource_density(cell)
-        if density > max_density:
-            max_density = density
-            target_pos = cell
-    
-    return target_pos if max_density > 0.0 else None
+
+    # Gather all densities at once and reduce with argmax
+    densities = world_state.resource_grid[xs, ys]
+    best = int(densities.argmax())
+
+    if densities[best] <= 0.0:
+        return None
+    return (int(xs[best]), int(ys[best]))
 
 
 def extract_resources(world_state: WorldState, position: Tuple[int, int]) -> float:
@@ -155,11 +260,78 @@ def extract_resources(world_state: WorldState, position: Tuple[int, int]) -> flo
     Returns:
         The amount of resources extracted
     """
-    if world_state.resource_grid is None:
+    grid = world_state.resource_grid
+    if grid is None:
         return 0.0
-    
-    density = world_state.get_resource_density(position)
-    return density * RESOURCE_EXTRACTION_RATE
+
+    # Index the grid directly; callers pass in-bounds positions from
+    # select_target_patch, so the helper's bounds check is just a guard
+    x, y = position
+    if not (0 <= x < world_state.grid_size and 0 <= y < world_state.grid_size):
+        return 0.0
+    return float(grid[x, y]) * RESOURCE_EXTRACTION_RATE
+
+
+def _fledglings_for_investment(
+    nest_position: Tuple[int, int],
+    total_investment: float,
+    world_state: WorldState
+) -> float:
+    """
+    Counterfactual fledgling yield from foraging the exploration area around
+    `nest_position` at the given total investment.
+
+    The yield depends on the investment only through the integer effective
+    radius, and the grid is static within a step, so results are memoized on
+    the world state keyed by (position, radius).
+
+    Args:
+        nest_position: Position of the nest
+        total_investment: Combined raising investment driving the radius
+        world_state: Read-only world state for resource queries
+
+    Returns:
+        Expected number of surviving fledglings
+    """
+    radius = _effective_radius(total_investment)
+    key = (nest_position[0], nest_position[1], radius)
+    cache = world_state._patch_fledgling_cache
+    fledglings = cache.get(key)
+    if fledglings is None:
+        xs, ys = determine_exploration_area(world_state, nest_position, total_investment)
+        total_resources = _scan_and_extract(world_state, xs, ys)
+        if total_resources == 0.0:
+            fledglings = _FLEDGLINGS_AT_ZERO
+        else:
+            fledglings = resource_to_fledglings(total_resources)
+        cache[key] = fledglings
+    return fledglings
+
+
+def _scan_and_extract(world_state: WorldState, xs: NDArray[np.int32], ys: NDArray[np.int32]) -> float:
+    """
+    Fused select_target_patch + extract_resources over an exploration area.
+
+    The target patch is only ever used for its density, so take the max over
+    the gathered densities and apply the extraction rate directly instead of
+    materializing the position and re-reading the grid there.
+
+    Args:
+        world_state: The current world state
+        xs: X indices of the cells in the exploration area
+        ys: Y indices of the cells in the exploration area
+
+    Returns:
+        The amount of resources extracted from the best patch, or 0.0 if
+        the area is empty or holds no resources
+    """
+    if xs.size == 0 or world_state.resource_grid is None:
+        return 0.0
+
+    max_density = float(world_state.resource_grid[xs, ys].max())
+    if max_density <= 0.0:
+        return 0.0
+    return max_density * RESOURCE_EXTRACTION_RATE
 
 
 def calculate_female_fitness_counterfactual(
@@ -181,20 +353,9 @@ def calculate_female_fitness_counterfactual(
         Fitness value in the counterfactual scenario
     """
     total_investment = my_raise + others_raise
-    
-    # Calculate exploration area based on total investment
-    home_range = determine_exploration_area(world_state, nest_position, total_investment)
-    
-    # Find target patch with maximum resource density
-    target_pos = select_target_patch(world_state, home_range)
-    
-    # Extract resources if target found
-    total_resources = 0.0
-    if target_pos:
-        total_resources = extract_resources(world_state, target_pos)
-    
-    # Convert resources to fledglings using logistic function
-    return resource_to_fledglings(total_resources)
+
+    # Fledgling yield from the exploration area at this total investment
+    return _fledglings_for_investment(nest_position, total_investment, world_state)
 
 
 def calculate_male_fitness_counterfactual(
@@ -222,15 +383,92 @@ def calculate_male_fitness_counterfactual(
         return 0.0
     
     paternity_share = my_raise / total_male_investment
-    
-    # Calculate total resources available to the nest
-    total_investment = total_male_investment  # Female's share is handled in others_raise
-    home_range = determine_exploration_area(world_state, nest_position, total_investment)
-    target_pos = select_target_patch(world_state, home_range)
-    
-    total_resources = 0.0
-    if target_pos:
-        total_resources = extract_resources(world_state, target_pos)
-    
-    # Convert resources to fledglings and multiply by paternity share
-    return resource_to_fledglings(total_resources) * paternity_share
+
+    # Fledgling yield at this total investment (female's share is handled in
+    # others_raise), weighted by paternity share
+    total_investment = total_male_investment
+    return _fledglings_for_investment(nest_position, total_investment, world_state) * paternity_share
+
+
+def calculate_female_marginal_utility(
+    my_raise: float,
+    others_raise: float,
+    nest_position: Tuple[int, int],
+    world_state: WorldState,
+    delta: float = MARGINAL_DELTA
+) -> float:
+    """
+    Marginal utility of additional female investment (d fitness / d my_raise),
+    evaluated as a finite difference over `delta`.
+
+    Female fitness depends on my_raise only through the integer exploration
+    radius, so unless the increment crosses a radius boundary the finite
+    difference is exactly zero and no counterfactual evaluation is needed.
+
+    Args:
+        my_raise: This agent's current hypothetical investment
+        others_raise: Belief about total investment from other agents
+        nest_position: Position of the nest
+        world_state: Read-only world state for resource queries
+        delta: Increment for the finite difference
+
+    Returns:
+        Marginal utility of investing delta more in this nest
+    """
+    if delta <= 0:
+        return 0.0
+
+    total_investment = my_raise + others_raise
+    if _effective_radius(total_investment) == _effective_radius(total_investment + delta):
+        return 0.0
+
+    base_fitness = calculate_female_fitness_counterfactual(
+        my_raise, others_raise, nest_position, world_state)
+    increment_fitness = calculate_female_fitness_counterfactual(
+        my_raise + delta, others_raise, nest_position, world_state)
+    return (increment_fitness - base_fitness) / delta
+
+
+def calculate_male_marginal_utility(
+    my_raise: float,
+    others_raise: float,
+    nest_position: Tuple[int, int],
+    world_state: WorldState,
+    delta: float = MARGINAL_DELTA
+) -> float:
+    """
+    Marginal utility of additional male investment (d fitness / d my_raise),
+    evaluated as a finite difference over `delta`.
+
+    When the increment does not cross an exploration-radius boundary, the
+    extracted resources are constant and only the paternity share moves, so a
+    single counterfactual evaluation suffices instead of two.
+
+    Args:
+        my_raise: This agent's current hypothetical investment
+        others_raise: Belief about total investment from other male agents
+        nest_position: Position of the nest
+        world_state: Read-only world state for resource queries
+        delta: Increment for the finite difference
+
+    Returns:
+        Marginal utility of investing delta more in this nest
+    """
+    if delta <= 0:
+        return 0.0
+
+    total_investment = my_raise + others_raise
+    if _effective_radius(total_investment) != _effective_radius(total_investment + delta):
+        # Radius boundary crossed: fall back to the full finite difference
+        base_fitness = calculate_male_fitness_counterfactual(
+            my_raise, others_raise, nest_position, world_state)
+        increment_fitness = calculate_male_fitness_counterfactual(
+            my_raise + delta, others_raise, nest_position, world_state)
+        return (increment_fitness - base_fitness) / delta
+
+    # Radius unchanged: extraction is constant, only the paternity share moves
+    fledglings = _fledglings_for_investment(nest_position, total_investment + delta, world_state)
+
+    base_share = my_raise / total_investment if total_investment > 0 else 0.0
+    increment_share = (my_raise + delta) / (total_investment + delta)
+    return fledglings * (increment_share - base_share) / delta
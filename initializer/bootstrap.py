@@ -1,8 +1,7 @@
 # initializer/bootstrap.py
-from typing import List, Tuple, Set, Literal
+from typing import List, Tuple, Literal
 import numpy as np
 from numpy.typing import NDArray
-import random
 from world.world_generator import WorldGenerator
 from world.world_state import WorldState
 from core.base_agent import BaseAgent
@@ -10,7 +9,7 @@ from agents.female_agent import FemaleAgent
 from agents.male_agent import MaleAgent
 from strategies.belief_system import BeliefSystem
 from simulation.orchestrator import Orchestrator
-from config.config import GRID_SIZE, RESOURCE_LEVEL, AGGREGATION_LEVEL, INITIAL_FEMALE_COUNT, INITIAL_MALE_COUNT, HOME_RANGE_RADIUS
+from config.config import GRID_SIZE, RESOURCE_LEVEL, AGGREGATION_LEVEL, INITIAL_FEMALE_COUNT, INITIAL_MALE_COUNT, HOME_RANGE_RADIUS, RANDOM_SEED
 
 
 def bootstrap() -> Tuple[WorldState, List[FemaleAgent], List[MaleAgent], Orchestrator]:
@@ -20,20 +19,23 @@ def bootstrap() -> Tuple[WorldState, List[FemaleAgent], List[MaleAgent], Orchest
     Returns:
         Tuple containing: WorldState, List[FemaleAgent], List[MaleAgent], Orchestrator
     """
+    # Single seeded generator shared by all initialization randomness
+    rng = np.random.default_rng(RANDOM_SEED)
+
     # 1. Generate resource map and world state
-    world_generator = WorldGenerator(GRID_SIZE, RESOURCE_LEVEL, AGGREGATION_LEVEL)
+    world_generator = WorldGenerator(GRID_SIZE, RESOURCE_LEVEL, AGGREGATION_LEVEL, rng)
     resource_map: NDArray[np.float32] = world_generator.generate_resources()
-    world_state = WorldState(resource_grid = resource_map)
-    
+    world_state = WorldState(resource_grid = resource_map, rng = rng)
+
     # 2. Spawn agents with initial positions (uniform random)
-    female_agents = [agent for agent in _spawn_agents(INITIAL_FEMALE_COUNT, "female", world_state) if isinstance(agent, FemaleAgent)]
-    male_agents = [agent for agent in _spawn_agents(INITIAL_MALE_COUNT, "male", world_state) if isinstance(agent, MaleAgent)]
-    
+    female_agents = [agent for agent in _spawn_agents(INITIAL_FEMALE_COUNT, "female", world_state, rng) if isinstance(agent, FemaleAgent)]
+    male_agents = [agent for agent in _spawn_agents(INITIAL_MALE_COUNT, "male", world_state, rng) if isinstance(agent, MaleAgent)]
+
     # 3. Allocate nests for female agents only
     _allocate_nests(female_agents, world_state, nest_radius=50, nests_per_agent=2)
-    
+
     # 4. Initialize male nest assignments
-    _initialize_male_nest_assignments(male_agents, world_state, nests_per_male=2, min_search_share=0.05)
+    _initialize_male_nest_assignments(male_agents, world_state, rng, nests_per_male=2, min_search_share=0.05)
     
     # 5. Initialize belief system and orchestrator
     belief_system = BeliefSystem()
@@ -46,29 +48,32 @@ def bootstrap() -> Tuple[WorldState, List[FemaleAgent], List[MaleAgent], Orchest
     return world_state, female_agents, male_agents, orchestrator
 
 
-def _spawn_agents(count: int, agent_type: Literal["female", "male"], world_state: WorldState) -> List[BaseAgent]:
+def _spawn_agents(count: int, agent_type: Literal["female", "male"], world_state: WorldState,
+                  rng: np.random.Generator) -> List[BaseAgent]:
     """
     Spawn agents with uniform random initial positions.
-    
+
     Args:
         count: Number of agents to spawn
         agent_type: Agent type, must be "female" or "male"
         world_state: Current world state
-        
+        rng: Shared seeded random generator
+
     Returns:
         List of spawned agents
     """
     agents: List[BaseAgent] = []
-    
-    # Get next available ID from existing agents in world state
-    next_agent_id = max(world_state.agents.keys()) + 1 if world_state.agents else 1
-    
+
+    # Reserve a contiguous ID block from the world state's counter
+    next_agent_id = world_state.allocate_agent_ids(count)
+
+    # Draw all positions in one batched RNG call
+    xs = rng.integers(0, world_state.grid_size, size=count)
+    ys = rng.integers(0, world_state.grid_size, size=count)
+
     for i in range(count): # type: ignore
-        # Generate uniform random position within grid bounds
-        x = random.randint(0, world_state.grid_size - 1)
-        y = random.randint(0, world_state.grid_size - 1)
-        position = (x, y)
-        
+        position = (int(xs[i]), int(ys[i]))
+
         # Create agent based on type
         agent_id = next_agent_id + i
         if agent_type == "female":
@@ -79,7 +84,7 @@ def _spawn_agents(count: int, agent_type: Literal["female", "male"], world_state
             raise ValueError(f"Invalid agent type: {agent_type}")
         
         agents.append(agent)
-        world_state.agents[agent.id] = agent
+        world_state.register_agent(agent)
     
     return agents
 
@@ -95,54 +100,67 @@ def _allocate_nests(agents: List[BaseAgent], world_state: WorldState,
         nest_radius: Radius to search for nest locations
         nests_per_agent: Number of nests to allocate per agent
     """
+    grid = world_state.resource_grid
+    if grid is None:
+        return
+    grid_size = world_state.grid_size
+
+    # Circular candidate mask, shared across agents
+    dx, dy = np.ogrid[-nest_radius:nest_radius + 1, -nest_radius:nest_radius + 1]
+    disk_mask = dx * dx + dy * dy <= nest_radius * nest_radius
+
+    # Home-range offset template (HOME_RANGE_RADIUS square window around the
+    # nest), built once and translated per nest
+    hr_coords = np.arange(-HOME_RANGE_RADIUS, HOME_RANGE_RADIUS + 1, dtype=np.int64)
+    hr_dxs, hr_dys = (offsets.ravel() for offsets in np.meshgrid(hr_coords, hr_coords, indexing='ij'))
+
     for agent in agents:
-        # Get all cells within nest_radius from agent's position
         x, y = agent.position
-        candidate_cells: List[Tuple[int, int]] = []
-        
-        # Generate all cells within nest_radius
-        for dx in range(-nest_radius, nest_radius + 1):
-            for dy in range(-nest_radius, nest_radius + 1):
-                if dx * dx + dy * dy <= nest_radius * nest_radius:
-                    cell_x = x + dx
-                    cell_y = y + dy
-                    if 0 <= cell_x < world_state.grid_size and 0 <= cell_y < world_state.grid_size:
-                        candidate_cells.append((cell_x, cell_y))
-        
-        # Sort cells by resource density in descending order
-        candidate_cells.sort(
-            key=lambda cell: world_state.get_resource_density(cell),
-            reverse=True
-        )
-        
-        # Select top nests_per_agent cells for nests
-        selected_cells = candidate_cells[:nests_per_agent]
+
+        # Clip the candidate window to grid bounds and mask it to the disk
+        x0, x1 = max(x - nest_radius, 0), min(x + nest_radius + 1, grid_size)
+        y0, y1 = max(y - nest_radius, 0), min(y + nest_radius + 1, grid_size)
+        window = grid[x0:x1, y0:y1]
+        mask = disk_mask[x0 - (x - nest_radius):x1 - (x - nest_radius),
+                         y0 - (y - nest_radius):y1 - (y - nest_radius)]
+
+        # Pick the nests_per_agent cells with the highest resource density;
+        # argpartition gives top-k without a full sort
+        values = np.where(mask, window, -np.inf).ravel()
+        if nests_per_agent < values.size:
+            top = np.argpartition(-values, nests_per_agent)[:nests_per_agent]
+        else:
+            top = np.arange(values.size)
+        top = top[np.argsort(-values[top])]
+
+        width = y1 - y0
+        selected_cells = [(x0 + int(idx) // width, y0 + int(idx) % width) for idx in top]
         
         # Create nests for the agent
         for cell in selected_cells:
-            # Calculate home range for this nest (10 grid units around nest)
-            home_range: Set[Tuple[int, int]] = set()
+            # Translate the home-range template to the nest, clip to grid
+            # bounds, and encode to flat cell indices (see encode_cell)
             nest_x, nest_y = cell
-            for dx in range(-HOME_RANGE_RADIUS, HOME_RANGE_RADIUS + 1):
-                for dy in range(-HOME_RANGE_RADIUS, HOME_RANGE_RADIUS + 1):
-                    hr_x = nest_x + dx
-                    hr_y = nest_y + dy
-                    if 0 <= hr_x < world_state.grid_size and 0 <= hr_y < world_state.grid_size:
-                        home_range.add((hr_x, hr_y))
-            
+            hr_xs = hr_dxs + nest_x
+            hr_ys = hr_dys + nest_y
+            valid = (hr_xs >= 0) & (hr_xs < grid_size) & (hr_ys >= 0) & (hr_ys < grid_size)
+            home_range_cells = hr_xs[valid] * grid_size + hr_ys[valid]
+            home_range_cells.setflags(write=False)  # Shared read-only by get_home_range
+
             # Create nest and associate with agent using WorldState's public method
             nest_id = world_state.create_nest_for_female(agent.id, cell)
             nest = world_state.nests[nest_id]
-            nest.home_range_cells = home_range
+            nest.home_range_cells = home_range_cells
             
             # Add nest ID to agent's nest list
             if isinstance(agent, FemaleAgent):
-                agent.nest_ids.add(nest.id)
+                agent.add_nest(nest.id)
 
 
-def _initialize_male_nest_assignments(male_agents: List[MaleAgent], 
-                                     world_state: WorldState, 
-                                     nests_per_male: int = 2, 
+def _initialize_male_nest_assignments(male_agents: List[MaleAgent],
+                                     world_state: WorldState,
+                                     rng: np.random.Generator,
+                                     nests_per_male: int = 2,
                                      min_search_share: float = 0.05) -> None:
     """
     Initialize male nest assignments with random raising share distribution.
@@ -152,26 +170,31 @@ def _initialize_male_nest_assignments(male_agents: List[MaleAgent],
     if not all_nests:
         return
 
+    num_males = len(male_agents)
+    nests_per_male = min(nests_per_male, len(all_nests))
+
+    # Batch all random draws: search shares, per-male nest picks (sampling
+    # without replacement via per-row random keys), and share proportions
+    search_shares = rng.uniform(min_search_share, 0.95, size=num_males)
+    nest_keys = rng.random((num_males, len(all_nests)))
+    if nests_per_male < len(all_nests):
+        nest_picks = np.argpartition(nest_keys, nests_per_male, axis=1)[:, :nests_per_male]
+    else:
+        nest_picks = np.tile(np.arange(len(all_nests)), (num_males, 1))
+    weights = rng.random((num_males, nests_per_male))
+    proportions = weights / weights.sum(axis=1, keepdims=True)
+
     for i, male in enumerate(male_agents): # type: ignore
-        # Generate random search share between min and max
-        search_share = random.uniform(min_search_share, 0.95)
-        raising_share_available = 1.0 - search_share
-        
-        # Get random nests for this male
-        male_nests = random.sample(all_nests, nests_per_male)
-        
-        # Generate random proportions that sum to 1
-        weights = [random.random() for _ in range(nests_per_male)]
-        total_weight = sum(weights)
-        proportions = [w / total_weight for w in weights]
-        
+        raising_share_available = 1.0 - search_shares[i]
+
         # Assign nests and distribute raising shares proportionally
-        for j, nest_id in enumerate(male_nests):
+        for j in range(nests_per_male):
+            nest_id = all_nests[nest_picks[i, j]]
             male.assign_to_nest(nest_id, "alpha")
-            raising_share = raising_share_available * proportions[j]
-            
+            raising_share = raising_share_available * proportions[i, j]
+
             nest = world_state.nests[nest_id]
-            nest.male_raising_shares[male.id] = raising_share
+            nest.set_male_raising_share(male.id, raising_share)
             nest.add_male(male.id)
 
         
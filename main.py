@@ -1,7 +1,7 @@
 # main.py
 # Entry point for the simulation system
 from initializer.bootstrap import bootstrap
-from simulation.game_loop import GameLoop
+from simulation.game_loop import GameLoop, configure_logging
 from config.config import LOOP_ROUND
 
 
@@ -15,6 +15,7 @@ def main():
     """
     # Configuration is now loaded from config/config.py - THE SOURCE OF TRUTH
     print("Loading configuration from config/config.py...")
+    configure_logging()
     
     # 1. Initialize simulation environment
     print("Initializing simulation environment...")
@@ -1,7 +1,11 @@
 # simulation/game_loop.py
-import random
 import logging
-from typing import List, Dict, Tuple, Any, cast
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Any
+import numpy as np
+from config.config import ALLOCATION_WORKERS, LOG_LEVEL, RANDOM_SEED
 from world.world_state import WorldState
 from core.base_agent import BaseAgent
 from agents.female_agent import FemaleAgent
@@ -12,16 +16,68 @@ from strategies.female_strategy import FemaleStrategy
 from strategies.male_strategy import MaleStrategy
 from core.fitness import mine_resources
 
-# Set up logging for strategy decisions
-logging.basicConfig(
-    filename='breed_share_debug.log',
-    level=logging.INFO,  # Set to INFO to capture strategy decisions
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='w'  # Overwrite log file each time
-)
+logger = logging.getLogger(__name__)
 
+# Action type codes for the structure-of-arrays action buffers
+ACTION_SEARCH = 0
+ACTION_RAISE = 1
 
-def handle_male_joining_nest(male: MaleAgent, nest_id: int, role: str, 
+
+def configure_logging(level: Optional[int] = None) -> None:
+    """
+    Set up logging for strategy decisions.
+
+    Called explicitly from the entry point (main.py) rather than at import
+    time, so importing this module has no side effects on logging state.
+
+    Args:
+        level: Logging level; defaults to config.LOG_LEVEL. The default is
+            WARNING so the per-agent INFO lines in the daily loop cost
+            nothing unless explicitly opted into (set LOG_LEVEL = "INFO"
+            to capture strategy decisions).
+    """
+    if level is None:
+        level = getattr(logging, LOG_LEVEL, logging.WARNING)
+    logging.basicConfig(
+        filename='breed_share_debug.log',
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        filemode='w'  # Overwrite log file each time
+    )
+
+
+class WorldSnapshot:
+    """
+    Lazy view of the daily world snapshot.
+
+    Fields are computed on first access instead of eagerly rebuilding the
+    agent-position and nest-location dicts every day; strategies that only
+    touch the resource grid (the common case) pay nothing for the rest.
+    """
+
+    __slots__ = ('_world_state', '_all_agents', '_agent_positions')
+
+    def __init__(self, world_state: WorldState, all_agents: List[BaseAgent]):
+        self._world_state = world_state
+        self._all_agents = all_agents
+        self._agent_positions: Optional[Dict[int, Tuple[int, int]]] = None
+
+    @property
+    def resource_distribution(self):
+        return self._world_state.resource_grid
+
+    @property
+    def agent_positions(self) -> Dict[int, Tuple[int, int]]:
+        if self._agent_positions is None:
+            self._agent_positions = {agent.id: agent.position for agent in self._all_agents}
+        return self._agent_positions
+
+    @property
+    def nest_locations(self) -> List[Tuple[int, int]]:
+        return self._world_state.get_nest_locations()
+
+
+def handle_male_joining_nest(male: MaleAgent, nest_id: int, role: str,
                                 world_state: WorldState, 
                                 females: Dict[int, FemaleAgent]):
     """Ensure state consistency when a male joins a nest."""
@@ -67,14 +123,65 @@ class GameLoop:
         self.male_agents = male_agents
         self.orchestrator = orchestrator
         
-        # Convert agent lists to dictionaries for quick access
+        # Convert agent lists to dictionaries for quick access. The combined
+        # roster is built once and then maintained in place by
+        # add_agent/remove_agent; _all_agent_ids is a parallel int32 column
+        # (same order) for vectorized dispatch by position.
         self._female_dict = {agent.id: agent for agent in female_agents}
         self._male_dict = {agent.id: agent for agent in male_agents}
-        self._all_agents = female_agents + male_agents
-        
+        self._all_agents: List[BaseAgent] = female_agents + male_agents
+        self._all_agent_ids = np.fromiter(
+            (agent.id for agent in self._all_agents), dtype=np.int32, count=len(self._all_agents))
+
         # Daily strategy cache: Agent ID -> Strategy decisions
         self._daily_strategy_cache: Dict[int, Dict[str, Any]] = {}
+
+        # Dedicated generator for action-order shuffling, seeded from config
+        # for reproducible runs
+        self._rng = np.random.default_rng(RANDOM_SEED)
+
+        # Structure-of-arrays action buffers, reused across days and grown
+        # geometrically. Storing columns (type code, agent index, nest id,
+        # share) instead of a list of tuples avoids allocating N_actions
+        # tuples per day; shuffling permutes a flat index vector instead of
+        # object references.
+        self._action_count = 0
+        cap = 256
+        self._action_types = np.empty(cap, dtype=np.int8)
+        self._action_agent_idx = np.empty(cap, dtype=np.int32)
+        self._action_nest_ids = np.empty(cap, dtype=np.int32)
+        self._action_shares = np.empty(cap, dtype=np.float64)
     
+    def add_agent(self, agent: BaseAgent) -> None:
+        """
+        Add an agent to the roster, keeping all lookup structures in sync.
+
+        Args:
+            agent: The agent to add (FemaleAgent or MaleAgent)
+        """
+        if type(agent) is FemaleAgent:
+            self._female_dict[agent.id] = agent
+        else:
+            self._male_dict[agent.id] = agent
+        self._all_agents.append(agent)
+        self._all_agent_ids = np.append(self._all_agent_ids, np.int32(agent.id))
+        self.orchestrator.mark_bindings_dirty()
+
+    def remove_agent(self, agent_id: int) -> None:
+        """
+        Remove an agent from the roster, keeping all lookup structures in sync.
+
+        Args:
+            agent_id: ID of the agent to remove
+        """
+        self._female_dict.pop(agent_id, None)
+        self._male_dict.pop(agent_id, None)
+        pos = next((i for i, agent in enumerate(self._all_agents) if agent.id == agent_id), -1)
+        if pos >= 0:
+            del self._all_agents[pos]
+            self._all_agent_ids = np.delete(self._all_agent_ids, pos)
+        self.orchestrator.mark_bindings_dirty()
+
     def run(self, num_days: int) -> Dict[str, Any]:
         """
         Run the simulation for the specified number of days.
@@ -116,147 +223,207 @@ class GameLoop:
         world_snapshot = self._get_world_snapshot()
         
         # 2. Bind strategies for all agents at the start of the day
-        self.orchestrator.bind_all(cast(List[BaseAgent], self._all_agents))
-        
-        # 3. Iterate through each agent to get their strategies
-        self._collect_agent_strategies(world_snapshot)
-        
-        # 4. Generate action list from strategies
-        action_list = self._generate_action_list()
+        self.orchestrator.bind_all(self._all_agents)  # type: ignore[arg-type]
         
-        # 5. Shuffle action list for random execution order
-        random.shuffle(action_list)
-        
-        # 6. Execute actions in random order
-        nest_resources = self._execute_actions(action_list)
-        
-        # 7. Reset world state resources after each round
+        # 3. Iterate through each agent to get their strategies and emit
+        #    their actions into the SoA buffers in the same pass
+        num_actions = self._collect_agent_strategies(world_snapshot)
+
+        # 4. Shuffle an index permutation for random execution order;
+        #    rng.permutation is C-level Fisher-Yates over flat ints
+        order = self._rng.permutation(num_actions)
+
+        # 5. Execute actions in random order
+        nest_resources = self._execute_actions(order)
+
+        # 6. Reset world state resources after each round
         self._reset_world_resources()
         
         return {'nest_resources': nest_resources}
     
-    def _get_world_snapshot(self) -> Dict[str, Any]:
+    def _get_world_snapshot(self) -> WorldSnapshot:
         """
         Get world snapshot from WorldState.
-        
+
         Returns:
-            Dictionary containing resource distribution and all agent positions
+            Lazy snapshot view exposing resource distribution, agent
+            positions, and nest locations on demand
         """
-        return {
-            'resource_distribution': self.world_state.resource_grid,
-            'agent_positions': {
-                agent.id: agent.position for agent in self._all_agents
-            },
-            'nest_locations': self.world_state.get_nest_locations()
-        }
+        return WorldSnapshot(self.world_state, self._all_agents)
     
-    def _collect_agent_strategies(self, world_snapshot: Dict[str, Any]) -> None:
+    def _append_action(self, action_type: int, agent_idx: int,
+                       nest_id: int, share: float) -> None:
         """
-        Collect strategies from all agents.
-        
+        Append one action to the SoA buffers, doubling capacity as needed.
+
+        Args:
+            action_type: ACTION_SEARCH or ACTION_RAISE
+            agent_idx: Index of the acting agent in self._all_agents
+            nest_id: Target nest ID
+            share: Search or raising share for the action
+        """
+        count = self._action_count
+        if count == self._action_types.size:
+            new_cap = count * 2
+            self._action_types = np.resize(self._action_types, new_cap)
+            self._action_agent_idx = np.resize(self._action_agent_idx, new_cap)
+            self._action_nest_ids = np.resize(self._action_nest_ids, new_cap)
+            self._action_shares = np.resize(self._action_shares, new_cap)
+        self._action_types[count] = action_type
+        self._action_agent_idx[count] = agent_idx
+        self._action_nest_ids[count] = nest_id
+        self._action_shares[count] = share
+        self._action_count = count + 1
+
+    def _collect_agent_strategies(self, world_snapshot: WorldSnapshot) -> int:
+        """
+        Collect strategies from all agents and emit their actions into the
+        SoA buffers in the same pass, while each agent reference is in hand.
+
         Args:
             world_snapshot: Current world snapshot
+
+        Returns:
+            Number of actions emitted into the SoA buffers
         """
-        import logging
-        
         self._daily_strategy_cache.clear()
-        
-        for agent in self._all_agents:
-            # Get strategy from orchestrator
-            strategy = self.orchestrator.get_strategy(agent)
-            
-            if strategy is None:
-                continue
-            
-            # Get agent's strategy decisions for this round
-            if isinstance(agent, FemaleAgent) or isinstance(agent, MaleAgent):
-                # Get allocation from strategy
-                allocation = strategy.allocate_shares(agent.id, self.world_state)
-                
-                # Cache the strategy decisions
-                self._daily_strategy_cache[agent.id] = {
-                    'search_share': allocation.get('search_share', 0.0),
-                    'raising_shares': allocation.get('raising_shares', {})
-                }
-                
-                # Log strategy decisions
-                agent_type = "Female" if isinstance(agent, FemaleAgent) else "Male"
-                logging.info(f"{agent_type} Agent {agent.id} - search_share: {allocation.get('search_share', 0.0):.3f}, raising_shares: {allocation.get('raising_shares', {})}")
-            else:
-                continue
-    
-    def _generate_action_list(self) -> List[Tuple[str, BaseAgent, int, float]]:
+        self._action_count = 0
+
+        use_threads = ALLOCATION_WORKERS > 1
+        if use_threads and any(type(agent) is FemaleAgent and not agent.nest_ids
+                               for agent in self._all_agents):
+            # A female with no nests creates one inside allocate_shares,
+            # mutating world_state.nests (and the nest-ID counter)
+            # non-atomically while other workers iterate it — a duplicate-ID
+            # and dictionary-mutation hazard the buffer lock does not cover.
+            # Collect sequentially whenever that path is reachable.
+            logger.warning(
+                "Thread-parallel collection disabled for this day: a female "
+                "with no nests would create one mid-collection")
+            use_threads = False
+
+        if use_threads:
+            # Experimental thread-parallel collection. The lock serializes
+            # buffer appends, but allocation is not read-only (observation
+            # submissions mutate shared beliefs) and execution order is
+            # nondeterministic, so keep the default at 1 for reproducible runs.
+            lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=ALLOCATION_WORKERS) as executor:
+                list(executor.map(
+                    lambda pair: self._collect_one_strategy(pair[0], pair[1], lock),
+                    enumerate(self._all_agents)))
+        else:
+            for agent_idx, agent in enumerate(self._all_agents):
+                self._collect_one_strategy(agent_idx, agent)
+
+        return self._action_count
+
+    def _collect_one_strategy(self, agent_idx: int, agent: BaseAgent,
+                              lock: Optional[threading.Lock] = None) -> None:
         """
-        Generate action list from search_share and raising_share > 0.
-        
-        Returns:
-            List of tuples (ActionType, Agent, Nest ID, share)
-            ActionType can be 'search' or 'raise'
+        Collect and cache the daily strategy decision for a single agent,
+        appending the resulting actions to the SoA buffers.
+
+        Args:
+            agent_idx: Index of the agent in self._all_agents
+            agent: The agent to collect a strategy for
+            lock: Serializes buffer appends under thread-parallel collection
         """
-        action_list = []
-        
-        for agent_id, strategy in self._daily_strategy_cache.items():
-            agent = self._female_dict.get(agent_id) or self._male_dict.get(agent_id)
-            
-            if agent is None:
-                continue
-            
-            # Get search share for this agent
-            search_share = strategy['search_share']
-            
-            # Get raising shares for this agent
-            raising_shares = strategy['raising_shares']
-            
-            # Add search action if search_share > 0
-            if search_share > 0:
-                # For search, we'll add it for all nests the agent is involved with
+        # Get strategy from orchestrator
+        strategy = self.orchestrator.get_strategy(agent)
+
+        if strategy is None:
+            return
+
+        # Get agent's strategy decisions for this round. Agents are concrete
+        # FemaleAgent/MaleAgent instances with no subclasses, so an exact
+        # type check is cheaper than the isinstance chain.
+        agent_cls = type(agent)
+        if agent_cls is FemaleAgent or agent_cls is MaleAgent:
+            # Get allocation from strategy
+            allocation = strategy.allocate_shares(agent.id, self.world_state)
+            search_share = allocation.get('search_share', 0.0)
+            raising_shares = allocation.get('raising_shares', {})
+
+            # Inactive agents (no search and no positive raising share)
+            # produce no actions; skip the cache insert and logging entirely
+            if search_share == 0 and not any(share > 0 for share in raising_shares.values()):
+                return
+
+            # Cache the strategy decisions
+            self._daily_strategy_cache[agent.id] = {
+                'search_share': search_share,
+                'raising_shares': raising_shares
+            }
+
+            # Emit actions directly: for each active nest, a search action
+            # (when search_share > 0) and a raise action
+            if lock is not None:
+                lock.acquire()
+            try:
                 for nest_id, raising_share in raising_shares.items():
                     if raising_share > 0:
-                        action_list.append(('search', agent, nest_id, search_share))
-            
-            # Add raise actions for raising_share > 0
-            for nest_id, raising_share in raising_shares.items():
-                if raising_share > 0:
-                    action_list.append(('raise', agent, nest_id, raising_share))
-        
-        return action_list
+                        if search_share > 0:
+                            self._append_action(ACTION_SEARCH, agent_idx, nest_id, search_share)
+                        self._append_action(ACTION_RAISE, agent_idx, nest_id, raising_share)
+            finally:
+                if lock is not None:
+                    lock.release()
+
+            # Log strategy decisions; the isEnabledFor guard skips the
+            # message formatting entirely when INFO logging is off
+            if logger.isEnabledFor(logging.INFO):
+                agent_type = "Female" if agent_cls is FemaleAgent else "Male"
+                logger.info("%s Agent %d - search_share: %.3f, raising_shares: %s",
+                            agent_type, agent.id, search_share, raising_shares)
     
-    def _execute_actions(self, action_list: List[Tuple[str, BaseAgent, int, float]]) -> Dict[int, float]:
+    def _execute_actions(self, order: np.ndarray) -> Dict[int, float]:
         """
-        Execute actions in random order.
-        
+        Execute the actions in the SoA buffers in the given order.
+
         Args:
-            action_list: List of actions to execute
-            
+            order: Permutation of action indices into the SoA buffers
+
         Returns:
             Dictionary containing accumulated resources for each nest
         """
-        nest_resources = {}
-        
-        for action_type, agent, nest_id, share in action_list:
-            if action_type == 'search':
+        nest_resources: Dict[int, float] = defaultdict(float)
+
+        # Hoist shared lookups out of the dispatch loop; membership in the
+        # male-id view replaces per-action isinstance checks
+        world_state = self.world_state
+        nests = world_state.nests
+        females = self._female_dict
+        male_ids = self._male_dict.keys()
+        agents = self._all_agents
+        action_types = self._action_types
+        action_agent_idx = self._action_agent_idx
+        action_nest_ids = self._action_nest_ids
+        action_shares = self._action_shares
+
+        for k in order:
+            agent = agents[action_agent_idx[k]]
+            nest_id = int(action_nest_ids[k])
+            share = float(action_shares[k])
+            if action_types[k] == ACTION_SEARCH:
                 # Execute search action
                 self._execute_search(agent, nest_id, share)
-            elif action_type == 'raise':
+            else:
                 # Execute raise action
                 resource_amount = self._execute_raise(agent, nest_id, share)
-                
+
                 # Accumulate nest resources
-                if nest_id in nest_resources:
-                    nest_resources[nest_id] += resource_amount
-                else:
-                    nest_resources[nest_id] = resource_amount
-                
+                nest_resources[nest_id] += resource_amount
+
                 # If this is a male agent with positive raising share, ensure state consistency
-                if isinstance(agent, MaleAgent) and share > 0:
+                if share > 0 and agent.id in male_ids:
                     # Determine role based on raising share (simplified)
                     # TODO: Implement alpha and beta role distinction based on raising share or other factors
                     role = "alpha"  # Default role for now, could be more complex
-                    handle_male_joining_nest(agent, nest_id, role, self.world_state, self._female_dict)
+                    handle_male_joining_nest(agent, nest_id, role, world_state, females)
                     # Update male_raising_shares in the nest
-                    nest = self.world_state.nests[nest_id]
-                    nest.male_raising_shares[agent.id] = share
-        
+                    nests[nest_id].set_male_raising_share(agent.id, share)
+
         return nest_resources
     
     def _execute_search(self, agent: BaseAgent, nest_id: int, search_share: float) -> None:
@@ -276,7 +443,8 @@ class GameLoop:
             # Move agent to the nest location before searching
             nest = self.world_state.nests[nest_id]
             agent.move_to(nest.position)
-            
+            self.world_state.notify_agent_moved(agent.id, nest.position)
+
             # Query nest composition using WorldState
             nest_details = self.world_state.query_nest_composition(
                 agent_id=agent.id,
@@ -303,7 +471,8 @@ class GameLoop:
         # Move agent to the nest location before raising
         nest = self.world_state.nests[nest_id]
         agent.move_to(nest.position)
-        
+        self.world_state.notify_agent_moved(agent.id, nest.position)
+
         # Call mine_resources from fitness.py to handle resource extraction
         extracted_resources = mine_resources(
             world_state=self.world_state,
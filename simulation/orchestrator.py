@@ -37,6 +37,21 @@ class Orchestrator:
         
         # Strategy type tracking: Agent ID -> Strategy class type
         self._agent_strategy_type_map: Dict[int, Type[object]] = {}
+
+        # Identity and length of the last agent list passed to bind_all;
+        # lets the daily rebind become a no-op while the agent set is stable
+        self._bound_list_id: Optional[int] = None
+        self._bound_count: int = -1
+
+    def mark_bindings_dirty(self) -> None:
+        """
+        Force the next bind_all call to rebind.
+
+        Call this after changing the agent population (spawn/death) or
+        swapping an agent's strategy type.
+        """
+        self._bound_list_id = None
+        self._bound_count = -1
     
     def bind_one(self, agent: BaseAgent) -> object:
         """
@@ -84,12 +99,21 @@ class Orchestrator:
         Batch bind strategies to all agents in the list.
         
         This method is typically called by game_loop before daily decisions.
-        
+        Rebinding is skipped when the same, unchanged agent list was already
+        bound — the mapping is stable while the population is fixed. Call
+        mark_bindings_dirty after population or strategy-type changes.
+
         Args:
             agent_list: List of agents to bind strategies to
         """
+        if id(agent_list) == self._bound_list_id and len(agent_list) == self._bound_count:
+            return
+
         for agent in agent_list:
             self.bind_one(agent)
+
+        self._bound_list_id = id(agent_list)
+        self._bound_count = len(agent_list)
     
     def get_strategy(self, agent: BaseAgent) -> Optional[object]:
         """
@@ -1,10 +1,9 @@
 # strategies/female_strategy.py
-import random
 from typing import Dict, Any
 from core.base_strategy import BaseStrategy
 from world.world_state import WorldState
 from config.config import MIN_SEARCH_SHARE, ALLOCATION_STEPS, MARGINAL_DELTA
-from core.fitness import calculate_female_fitness, calculate_female_fitness_counterfactual
+from core.fitness import calculate_female_fitness_batch, calculate_female_marginal_utility
 
 class FemaleStrategy(BaseStrategy):
     """
@@ -43,7 +42,8 @@ class FemaleStrategy(BaseStrategy):
         if not hasattr(female, 'nest_ids'):
             raise ValueError(f"Agent {agent_id} is not a female agent")
         
-        owned_nests: list[int] = list(female.nest_ids)  # type: ignore
+        # Reuse the agent's cached tuple instead of copying the set per call
+        owned_nests = female.get_owned_nests()  # type: ignore
         num_nests = len(owned_nests)
         
         # Base case: no nests - create a new nest
@@ -54,9 +54,9 @@ class FemaleStrategy(BaseStrategy):
                 position=female.position
             )
             # Add the new nest to the female's owned nests
-            female.nest_ids.add(new_nest_id)  # type: ignore
+            female.add_nest(new_nest_id)  # type: ignore
             # Update owned_nests list and num_nests count
-            owned_nests = [new_nest_id]
+            owned_nests = (new_nest_id,)
             num_nests = 1
             # Set search_share to minimum since we just created a nest
             search_share = MIN_SEARCH_SHARE
@@ -75,8 +75,7 @@ class FemaleStrategy(BaseStrategy):
             agent_id=agent_id,
             available_nests=owned_nests,
             total_raising_share=total_raising_share,
-            belief_func=lambda nest_id: self.get_raising_belief(agent_id, nest_id),
-            fitness_func=calculate_female_fitness_counterfactual,
+            marginal_utility_func=calculate_female_marginal_utility,
             world_state=world_state
         )
         
@@ -96,23 +95,35 @@ class FemaleStrategy(BaseStrategy):
             agent_id: The observing agent's ID
             world_state: The current world state
         """
-        # Get all other female agents
-        female_agents = [agent for agent in world_state.agents.values() 
-                        if hasattr(agent, 'nest_ids') and agent.id != agent_id]
-        
-        for observed_agent in female_agents:
-            # For simplicity, we'll assume the observed agent's current search_share is stored somewhere
-            # In a real implementation, this would be retrieved from the agent's history
-            # For now, we'll use a random value similar to the current implementation
-            # TODO: Store and retrieve actual search_share from agent's history
-            observed_search_share = random.uniform(MIN_SEARCH_SHARE, 1.0)
+        # Iterate the pre-partitioned female registry directly; no per-call
+        # rebuild of a filtered list and no hasattr reflection
+        agents = world_state.agents
+        female_ids = world_state.female_agent_ids
+
+        # For simplicity, we'll assume the observed agent's current search_share is stored somewhere
+        # In a real implementation, this would be retrieved from the agent's history
+        # For now, we'll use random values similar to the current implementation,
+        # drawn in one batched RNG call instead of one per peer
+        # TODO: Store and retrieve actual search_share from agent's history
+        observed_shares = world_state.rng.uniform(MIN_SEARCH_SHARE, 1.0, size=len(female_ids))
+
+        for observed_id, observed_share in zip(female_ids, observed_shares):
+            if observed_id == agent_id:
+                continue
+            observed_agent = agents[observed_id]
+            observed_search_share = float(observed_share)
             
-            # Calculate fitness for the observed agent
-            total_fitness = 0.0
-            for nest_id in getattr(observed_agent, 'nest_ids', []):
-                if nest_id in world_state.nests:
-                    nest = world_state.nests[nest_id]
-                    total_fitness += calculate_female_fitness(nest, world_state)
+            # Calculate fitness for the observed agent across all its nests;
+            # the value depends only on the peer, so it is memoized per round
+            total_fitness = world_state._agent_fitness_cache.get(observed_id)
+            if total_fitness is None:
+                # The registry guarantees a FemaleAgent, so access nest_ids
+                # directly instead of through getattr reflection
+                observed_nests = [nest_id for nest_id in observed_agent.nest_ids
+                                  if nest_id in world_state.nests]
+                total_fitness = float(calculate_female_fitness_batch(observed_nests, world_state).sum()) \
+                    if observed_nests else 0.0
+                world_state._agent_fitness_cache[observed_id] = total_fitness
             
             # Submit observation to belief system
             self.submit_search_observation(agent_id, observed_agent.id, observed_search_share, total_fitness)
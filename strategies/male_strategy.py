@@ -1,10 +1,9 @@
 # strategies/male_strategy.py
-import random
 from typing import Dict, Any
 from core.base_strategy import BaseStrategy
 from world.world_state import WorldState
 from config.config import MIN_SEARCH_SHARE, ALLOCATION_STEPS, MARGINAL_DELTA
-from core.fitness import calculate_male_fitness, calculate_male_fitness_counterfactual
+from core.fitness import calculate_male_fitness, calculate_male_marginal_utility
 
 class MaleStrategy(BaseStrategy):
     """
@@ -42,14 +41,11 @@ class MaleStrategy(BaseStrategy):
         if not hasattr(male, 'nest_roles'):
             raise ValueError(f"Agent {agent_id} is not a male agent")
         
-        # Get all nests the male has searched or is assigned to
-        # Currently, we'll include all nests since search history isn't tracked yet
-        assigned_nests = list(getattr(male, 'nest_roles', {}).keys())
-        all_nests = list(world_state.nests.keys())
-        
-        # Male can go to any nest he has searched or is assigned to
-        # For now, include all nests as search history isn't implemented
-        available_nests = list(set(assigned_nests + all_nests))
+        # Male can go to any nest he has searched or is assigned to.
+        # Assigned nests are a subset of all nests, and search history isn't
+        # tracked yet, so the candidate set is simply every nest in the world.
+        # TODO: Restrict to assigned/searched nests once history is implemented
+        available_nests = list(world_state.nests.keys())
         num_nests = len(available_nests)
         
         # Base case: no assigned nests
@@ -73,8 +69,7 @@ class MaleStrategy(BaseStrategy):
             agent_id=agent_id,
             available_nests=available_nests,
             total_raising_share=total_raising_share,
-            belief_func=lambda nest_id: self.get_raising_belief(agent_id, nest_id),
-            fitness_func=calculate_male_fitness_counterfactual,
+            marginal_utility_func=calculate_male_marginal_utility,
             world_state=world_state
         )
         
@@ -94,23 +89,36 @@ class MaleStrategy(BaseStrategy):
             agent_id: The observing agent's ID
             world_state: The current world state
         """
-        # Get all other male agents
-        male_agents = [agent for agent in world_state.agents.values() 
-                      if hasattr(agent, 'nest_roles') and agent.id != agent_id]
-        
-        for observed_agent in male_agents:
-            # For simplicity, we'll assume the observed agent's current search_share is stored somewhere
-            # In a real implementation, this would be retrieved from the agent's history
-            # For now, we'll use a random value similar to the current implementation
-            # TODO: Store and retrieve actual search_share from agent's history
-            observed_search_share = random.uniform(MIN_SEARCH_SHARE, 1.0)
+        # Iterate the pre-partitioned male registry directly; no per-call
+        # rebuild of a filtered list and no hasattr reflection
+        agents = world_state.agents
+        male_ids = world_state.male_agent_ids
+
+        # For simplicity, we'll assume the observed agent's current search_share is stored somewhere
+        # In a real implementation, this would be retrieved from the agent's history
+        # For now, we'll use random values similar to the current implementation,
+        # drawn in one batched RNG call instead of one per peer
+        # TODO: Store and retrieve actual search_share from agent's history
+        observed_shares = world_state.rng.uniform(MIN_SEARCH_SHARE, 1.0, size=len(male_ids))
+
+        for observed_id, observed_share in zip(male_ids, observed_shares):
+            if observed_id == agent_id:
+                continue
+            observed_agent = agents[observed_id]
+            observed_search_share = float(observed_share)
             
-            # Calculate fitness for the observed agent
-            total_fitness = 0.0
-            for nest_id in getattr(observed_agent, 'nest_roles', {}).keys():
-                if nest_id in world_state.nests:
-                    nest = world_state.nests[nest_id]
-                    total_fitness += calculate_male_fitness(nest, observed_agent.id, world_state)
+            # Calculate fitness for the observed agent; the value depends
+            # only on the peer, so it is memoized per round
+            total_fitness = world_state._agent_fitness_cache.get(observed_id)
+            if total_fitness is None:
+                total_fitness = 0.0
+                # The registry guarantees a MaleAgent, so access nest_ids
+                # directly instead of through getattr reflection
+                for nest_id in observed_agent.nest_ids:
+                    if nest_id in world_state.nests:
+                        nest = world_state.nests[nest_id]
+                        total_fitness += calculate_male_fitness(nest, observed_agent.id, world_state)
+                world_state._agent_fitness_cache[observed_id] = total_fitness
             
             # Submit observation to belief system
             self.submit_search_observation(agent_id, observed_agent.id, observed_search_share, total_fitness)
@@ -23,8 +23,8 @@ raising_shares = [0.0, 0.1, 0.5, 1.0, 1.5]  # 1.5 用于测试超过1.0的情况
 
 for rs in raising_shares:
     try:
-        home_range = determine_exploration_area(world_state, nest_pos, rs)
-        area_size = len(home_range)
+        xs, ys = determine_exploration_area(world_state, nest_pos, rs)
+        area_size = int(xs.size)
         print(f"raising_share = {rs:.2f} → home range area = {area_size} cells")
         # 计算理论半径
         base_radius = HOME_RANGE_RADIUS * rs
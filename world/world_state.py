@@ -1,14 +1,49 @@
 # world/world_state.py
-from typing import Dict, Tuple, Any, Optional, List
+from typing import Dict, Tuple, Any, Optional, List, NamedTuple, Set
 import math
 import numpy as np
 from numpy.typing import NDArray
-import random
 from config.config import RESOURCE_LEVEL, AGGREGATION_LEVEL, SEARCH_COST, GRID_SIZE
 from agents.nest import Nest
+from agents.female_agent import FemaleAgent
+from agents.male_agent import MaleAgent
 from core.base_agent import BaseAgent
 from world.world_generator import WorldGenerator
 
+
+def encode_cell(x: int, y: int, grid_size: int) -> int:
+    """
+    Pack an (x, y) grid coordinate into a single flat int index.
+
+    Encoded cells hash and compare as plain ints (no tuple allocation) and
+    can index resource_grid.flat directly, since the encoding matches the
+    grid's C-order layout.
+    """
+    return x * grid_size + y
+
+
+def decode_cell(code: int, grid_size: int) -> Tuple[int, int]:
+    """Unpack a flat cell index produced by encode_cell back into (x, y)."""
+    return code // grid_size, code % grid_size
+
+
+class NestView(NamedTuple):
+    """
+    Read-only view of a nest's composition returned by the query interface.
+
+    A slotted NamedTuple is one allocation with C-level field access, where
+    the previous per-query dict paid hashing on construction and on every
+    consumer lookup. male_ids and male_raising_shares reference live nest
+    state; do not mutate.
+    """
+    nest_id: int
+    female_id: Optional[int]
+    male_ids: Set[int]
+    position: Tuple[int, int]
+    female_raising_share: float
+    male_raising_shares: Dict[int, float]
+
+
 class WorldState:
     """Environment state management center.
     
@@ -21,15 +56,150 @@ class WorldState:
     """
     
     def __init__(self, nests: Optional[Dict[int, Nest]] = None, agents: Optional[Dict[int, BaseAgent]] = None,
-                 resource_grid: Optional[NDArray[np.float32]] = None):
+                 resource_grid: Optional[NDArray[np.float32]] = None,
+                 rng: Optional[np.random.Generator] = None):
         self._next_nest_id = 0
+        # Shared random generator for stochastic queries; bootstrap passes a
+        # seeded instance so whole runs are reproducible from RANDOM_SEED
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        # Reused by reset_resources; created lazily on the first reset
+        self._world_generator: Optional[WorldGenerator] = None
         self.nests: Dict[int, Nest] = nests if nests is not None else {}
         self.agents: Dict[int, BaseAgent] = agents if agents is not None else {}
+        # Monotonic counter for agent ID allocation; O(1) instead of
+        # scanning max(agents.keys()) on every spawn batch
+        self._next_agent_id: int = max(self.agents.keys()) + 1 if self.agents else 1
+
+        # Type-partitioned agent registries, maintained by register_agent so
+        # peer scans iterate the right population directly instead of
+        # filtering the full agent dict with reflection on every call
+        self.female_agent_ids: List[int] = []
+        self.male_agent_ids: List[int] = []
+        for agent in self.agents.values():
+            self._classify_agent(agent)
         
-        # spatial resource grid (supports spatial resource queries)
+        # spatial resource grid (supports spatial resource queries); forced
+        # to C-contiguous float32 so flat-index lookups (encode_cell order)
+        # and in-place regeneration hold regardless of how it was built
+        if resource_grid is not None:
+            resource_grid = np.ascontiguousarray(resource_grid, dtype=np.float32)
         self.resource_grid: Optional[NDArray[np.float32]] = resource_grid
         self.grid_size: int = resource_grid.shape[0] if resource_grid is not None else 0
+
+        # Per-step memo of Nest.get_total_resources keyed by nest_id; fitness
+        # queries hit the same nests repeatedly within a step, so the home
+        # range only needs to be summed once. Invalidated whenever the
+        # resource grid changes.
+        self._nest_resource_cache: Dict[int, float] = {}
+
+        # Per-step memo of observed-peer fitness keyed by agent_id; a peer's
+        # fitness is independent of who observes it, so the observation
+        # loops compute it once per round instead of once per observer.
+        # Invalidated with the other per-step caches.
+        self._agent_fitness_cache: Dict[int, float] = {}
+
+        # Per-step memo of counterfactual fledgling yield keyed by
+        # (nest_x, nest_y, effective_radius); the allocation loop revisits
+        # the same radius many times between integer-radius crossings.
+        # Invalidated together with _nest_resource_cache.
+        self._patch_fledgling_cache: Dict[Tuple[int, int, int], float] = {}
+
+        # SoA mirror of per-nest data for batched fitness evaluation. Rows
+        # follow nest-creation order and are never removed; positions are
+        # static so their column is maintained incrementally.
+        self._nest_rows: Dict[int, int] = {nest_id: row for row, nest_id in enumerate(self.nests)}
+        self._nest_position_list: List[Tuple[int, int]] = [nest.position for nest in self.nests.values()]
+        self._nest_positions: Optional[NDArray[np.int32]] = None
+
+        # Basic nest info (ID -> position), maintained incrementally on nest
+        # creation so the query interface returns it without rebuilding
+        self._nests_basic: Dict[int, Tuple[int, int]] = {
+            nest_id: nest.position for nest_id, nest in self.nests.items()}
+
+        # Cached SoA view of agent IDs and positions for vectorized radius
+        # queries; rebuilt lazily and invalidated whenever agents are added
+        # or move (see mark_agent_positions_dirty). The rebuild cost
+        # amortizes across all queries between invalidations.
+        self._agent_id_arr: Optional[NDArray[np.int64]] = None
+        self._agent_pos_arr: Optional[NDArray[np.float32]] = None
+        self._agent_rows: Dict[int, int] = {}
+
+        # Shape-keyed scratch buffers reused across calls to
+        # query_nest_compositions_batch, so repeated batches of the same
+        # (M, K) size allocate no intermediate arrays
+        self._batch_scratch: Dict[Tuple[int, int], Dict[str, NDArray[Any]]] = {}
     
+    def _classify_agent(self, agent: BaseAgent) -> None:
+        """Record the agent's ID in the matching type registry."""
+        if type(agent) is FemaleAgent:
+            self.female_agent_ids.append(agent.id)
+        elif type(agent) is MaleAgent:
+            self.male_agent_ids.append(agent.id)
+
+    def register_agent(self, agent: BaseAgent) -> None:
+        """
+        Add an agent to the world, keeping the type registries in sync.
+
+        Args:
+            agent: The agent to register
+        """
+        self.agents[agent.id] = agent
+        self._classify_agent(agent)
+        self.mark_agent_positions_dirty()
+
+    def mark_agent_positions_dirty(self) -> None:
+        """Invalidate the cached agent-position arrays (e.g. on roster changes)."""
+        self._agent_id_arr = None
+        self._agent_pos_arr = None
+        self._agent_rows.clear()
+
+    def notify_agent_moved(self, agent_id: int, new_position: Tuple[int, int]) -> None:
+        """
+        Update the position index in place after a single agent moves.
+
+        O(1) row write when the index is built; unknown agents fall back to
+        a full invalidation. Call sites that mutate positions directly
+        (agent.move_to) should notify so radius queries stay consistent.
+
+        Args:
+            agent_id: ID of the agent that moved
+            new_position: The agent's new (x, y) grid coordinates
+        """
+        if self._agent_pos_arr is None:
+            return  # Index not built yet; the next query rebuilds it lazily
+        row = self._agent_rows.get(agent_id)
+        if row is None:
+            self.mark_agent_positions_dirty()
+            return
+        self._agent_pos_arr[row, 0], self._agent_pos_arr[row, 1] = new_position
+
+    def _get_agent_position_arrays(self) -> Tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """Return (ids, positions) arrays over all agents, rebuilding if stale."""
+        if self._agent_id_arr is None or self._agent_pos_arr is None:
+            count = len(self.agents)
+            self._agent_id_arr = np.fromiter(self.agents.keys(), dtype=np.int64, count=count)
+            positions = np.empty((count, 2), dtype=np.float32)
+            self._agent_rows = {}
+            for row, agent in enumerate(self.agents.values()):
+                positions[row, 0], positions[row, 1] = agent.position
+                self._agent_rows[agent.id] = row
+            self._agent_pos_arr = positions
+        return self._agent_id_arr, self._agent_pos_arr
+
+    def allocate_agent_ids(self, count: int) -> int:
+        """
+        Reserve a contiguous block of agent IDs and return the first one.
+
+        Args:
+            count: Number of IDs to reserve
+
+        Returns:
+            First ID of the reserved block
+        """
+        first_id = self._next_agent_id
+        self._next_agent_id += count
+        return first_id
+
     def create_nest_for_female(self, female_id: int, position: Tuple[int, int]) -> int:
         """
         Create nest for female (allows multiple nests per female).
@@ -49,16 +219,57 @@ class WorldState:
         )
         self.nests[nest_id] = nest
         self._next_nest_id += 1
+
+        # Register the nest in the SoA mirror
+        self._nest_rows[nest_id] = len(self._nest_position_list)
+        self._nest_position_list.append(position)
+        self._nest_positions = None  # Rebuilt lazily on next SoA query
+        self._nests_basic[nest_id] = position
+
         return nest_id
     
+    def get_nest_rows(self) -> Dict[int, int]:
+        """Return the mapping from nest ID to row in the SoA arrays."""
+        return self._nest_rows
+
+    def get_nest_soa(self) -> Tuple[NDArray[np.int64], NDArray[np.int32], NDArray[np.float32],
+                                    NDArray[np.float32], NDArray[np.float32]]:
+        """
+        Structure-of-arrays snapshot of per-nest data for batched queries.
+
+        Rows follow nest-creation order (see get_nest_rows). Positions are
+        static and cached; the scalar columns are gathered fresh on each call
+        so they reflect the current nest state.
+
+        Returns:
+            Tuple of (nest_ids, positions, female_shares, male_share_totals,
+            resource_caches) arrays, where positions has shape (M, 2)
+        """
+        if self._nest_positions is None:
+            self._nest_positions = np.array(self._nest_position_list, dtype=np.int32).reshape(-1, 2)
+
+        nests = self.nests.values()
+        nest_ids = np.fromiter(self.nests.keys(), dtype=np.int64, count=len(self.nests))
+        female_shares = np.fromiter(
+            (nest.female_raising_share for nest in nests), dtype=np.float32, count=len(self.nests))
+        male_share_totals = np.fromiter(
+            (nest.get_male_raising_share() for nest in nests), dtype=np.float32, count=len(self.nests))
+        resource_caches = np.fromiter(
+            (nest.resource_cache for nest in nests), dtype=np.float32, count=len(self.nests))
+
+        return nest_ids, self._nest_positions, female_shares, male_share_totals, resource_caches
+
     def get_nest_locations(self) -> List[Tuple[int, int]]:
         """
         Get all nest locations in the environment.
-        
+
         Returns:
-            List of (x, y) coordinates for all nests
+            List of (x, y) coordinates for all nests, in nest-creation
+            order (read-only; do not mutate)
         """
-        return [nest.position for nest in self.nests.values()]
+        # Maintained incrementally by create_nest_for_female; positions are
+        # static, so no per-call rebuild is needed
+        return self._nest_position_list
     
     def get_resource_density(self, position: Tuple[int, int]) -> float:
         """
@@ -77,6 +288,43 @@ class WorldState:
         if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
             return float(self.resource_grid[x, y])
         return 0.0
+
+    def get_resource_densities(self, positions: NDArray[np.int64]) -> NDArray[np.float32]:
+        """
+        Get resource densities for an (M, 2) array of (x, y) positions in a
+        single fancy-indexed lookup. Out-of-bounds positions yield 0.0,
+        matching the scalar get_resource_density.
+
+        Args:
+            positions: Array of (x, y) grid coordinates, shape (M, 2)
+
+        Returns:
+            Array of resource densities, one per position
+        """
+        if self.resource_grid is None:
+            return np.zeros(len(positions), dtype=np.float32)
+
+        xs = positions[:, 0]
+        ys = positions[:, 1]
+        in_bounds = (xs >= 0) & (xs < self.grid_size) & (ys >= 0) & (ys < self.grid_size)
+        out = np.zeros(len(positions), dtype=np.float32)
+        out[in_bounds] = self.resource_grid[xs[in_bounds], ys[in_bounds]]
+        return out
+
+    def get_resource_density_flat(self, cells: NDArray[np.int64]) -> NDArray[np.float32]:
+        """
+        Get resource densities for an array of encoded flat cell indices
+        (see encode_cell) in a single gather.
+
+        Args:
+            cells: Array of flat cell indices, assumed in bounds
+
+        Returns:
+            Array of resource densities, one per cell
+        """
+        if self.resource_grid is None:
+            return np.zeros(len(cells), dtype=np.float32)
+        return self.resource_grid.ravel()[cells]
     
     def compute_distance(self, cell1: Tuple[int, int], cell2: Tuple[int, int]) -> float:
         """
@@ -85,6 +333,17 @@ class WorldState:
         dx = cell1[0] - cell2[0]
         dy = cell1[1] - cell2[1]
         return math.sqrt(dx * dx + dy * dy)
+
+    def compute_distance_sq(self, cell1: Tuple[int, int], cell2: Tuple[int, int]) -> float:
+        """
+        Compute squared Euclidean distance between two cells.
+
+        Prefer this over compute_distance for threshold tests: comparing
+        d^2 against r^2 gives the same answer without the sqrt.
+        """
+        dx = cell1[0] - cell2[0]
+        dy = cell1[1] - cell2[1]
+        return dx * dx + dy * dy
     
     def get_agents_in_radius(self, position: Tuple[int, int], radius: int) -> List[BaseAgent]:
         """
@@ -97,83 +356,140 @@ class WorldState:
         Returns:
             List of BaseAgent objects within the specified radius
         """
-        agents_in_radius = []
-        
-        for agent in self.agents.values():
-            distance = self.compute_distance(position, agent.position)
-            if distance <= radius:
-                agents_in_radius.append(agent)
-        
-        return agents_in_radius
+        agent_ids, agent_positions = self._get_agent_position_arrays()
+        if len(agent_ids) == 0:
+            return []
+
+        # One broadcast subtract and a squared-distance mask replace the
+        # per-agent Python loop; comparing d^2 against r^2 skips the sqrt
+        diff = agent_positions - np.asarray(position, dtype=np.float32)
+        mask = np.einsum('ij,ij->i', diff, diff) <= radius * radius
+        return [self.agents[agent_id] for agent_id in agent_ids[mask].tolist()]
     
     def get_all_nests_basic(self) -> Dict[int, Tuple[int, int]]:
-        """Return basic nest information (ID and position)."""
-        return {nest_id: nest.position for nest_id, nest in self.nests.items()}
+        """Return basic nest information (ID and position; read-only; do not mutate)."""
+        return self._nests_basic
     
-    def get_nest_details(self, nest_id: int) -> Dict[str, Any]:
+    def _nest_view(self, nest: Nest) -> NestView:
+        """Build the NestView for a nest (shared by the query methods)."""
+        return NestView(
+            nest_id=nest.id,
+            female_id=nest.female_id,
+            male_ids=nest.get_male_ids,  # Get the property value (no parentheses needed)
+            position=nest.position,
+            female_raising_share=nest.female_raising_share,
+            male_raising_shares=nest.male_raising_shares
+        )
+
+    def get_nest_details(self, nest_id: int) -> NestView:
         """
         Return complete nest information.
         """
-        nest = self.nests[nest_id]
-        return {
-            'nest_id': nest.id,
-            'female_id': nest.female_id,
-            'male_ids': nest.get_male_ids,  # Get the property value (no parentheses needed)
-            'position': nest.position
-        }
+        return self._nest_view(self.nests[nest_id])
     
     def get_agent_by_id(self, agent_id: int) -> BaseAgent:
         """Get agent object by ID."""
         return self.agents[agent_id]
 
-    def query_nest_composition(self, agent_id: int, nest_id: int, search_share: float) -> Optional[Dict[str, Any]]:
+    def query_nest_composition(self, agent_id: int, nest_id: int, search_share: float) -> Optional[NestView]:
         """
         Probabilistic query of nest internal composition based on distance and search share.
-        
+
         Args:
             agent_id: The ID of the agent performing the search
             nest_id: The ID of the nest to query
             search_share: The agent's search investment (0.0 to 1.0)
-            
+
         Returns:
-            Dictionary containing nest details if search is successful, else None
+            NestView with the nest's details if the search is successful, else None
         """
         # Get agent and nest objects
         agent = self.agents[agent_id]
         nest = self.nests[nest_id]
-        
-        # Compute distance between agent and nest
-        d = self.compute_distance(agent.position, nest.position)
-        
-        # If agent is at the nest, it automatically knows the nest information
-        if d == 0.0:
-            return {
-                'nest_id': nest.id,
-                'female_id': nest.female_id,
-                'male_ids': nest.get_male_ids,  # Get the property value (no parentheses needed)
-                'position': nest.position,
-                'female_raising_share': nest.female_raising_share,
-                'male_raising_shares': nest.male_raising_shares
-            }
-        
-        # Core magic formula: discovery probability
-        p = 1 - math.exp(- SEARCH_COST * search_share / d)
-        
-        # Return results based on probability
-        if random.random() < p:
-            # Search successful, return all nest information
-            return {
-                'nest_id': nest.id,
-                'female_id': nest.female_id,
-                'male_ids': nest.get_male_ids,  # Get the property value (no parentheses needed)
-                'position': nest.position,
-                'female_raising_share': nest.female_raising_share,
-                'male_raising_shares': nest.male_raising_shares
-            }
-        else:
-            # Failed to find detailed nest information
-            return None
+
+        # Squared distance suffices for the at-nest test; the sqrt runs only
+        # when the probabilistic check is actually needed.
+        d_sq = self.compute_distance_sq(agent.position, nest.position)
+
+        # An agent at the nest automatically knows its composition; otherwise
+        # the core magic formula gives discovery probability p = 1 - exp(-c*s/d),
+        # tested in rejection form. Drawing U uniform, U < p is equivalent
+        # to -log(1-U) * d < c*s (the left side is an exponential variate),
+        # which skips the division by d; 1-U is in (0, 1] so the log is safe.
+        discovered = d_sq == 0.0 or \
+            -math.log(1.0 - self.rng.random()) * math.sqrt(d_sq) < SEARCH_COST * search_share
+
+        return self._nest_view(nest) if discovered else None
     
+    def query_nest_compositions_batch(self, agent_ids: List[int], nest_ids: List[int],
+                                      search_shares: NDArray[np.float64]) -> List[Tuple[int, NestView]]:
+        """
+        Vectorized form of query_nest_composition over all (agent, nest) pairs.
+
+        Distances, discovery probabilities, and success draws are computed
+        as (M, K) matrices in single NumPy kernels, keeping the sqrt/exp
+        work inside C loops; Python-level work is limited to assembling
+        views for the successful pairs. Agents standing on a nest always
+        discover it, matching the scalar method.
+
+        Args:
+            agent_ids: IDs of the searching agents (length M)
+            nest_ids: IDs of the nests to query (length K)
+            search_shares: Search investment per agent (length M)
+
+        Returns:
+            List of (agent_id, NestView) pairs, one per successful
+            (agent, nest) combination
+        """
+        if not agent_ids or not nest_ids:
+            return []
+
+        agent_pos = np.array([self.agents[agent_id].position for agent_id in agent_ids],
+                             dtype=np.float64)
+        nest_pos = np.array([self.nests[nest_id].position for nest_id in nest_ids],
+                            dtype=np.float64)
+
+        # Fetch (or build once) scratch buffers for this batch shape; every
+        # kernel below writes into them via out=, so steady-state batches
+        # allocate nothing beyond the position gathers above
+        shape = (len(agent_ids), len(nest_ids))
+        scratch = self._batch_scratch.get(shape)
+        if scratch is None:
+            scratch = {
+                'diff': np.empty(shape + (2,), dtype=np.float64),
+                'd': np.empty(shape, dtype=np.float64),
+                'work': np.empty(shape, dtype=np.float64),
+                'hits': np.empty(shape, dtype=np.bool_),
+                'at_nest': np.empty(shape, dtype=np.bool_),
+            }
+            self._batch_scratch[shape] = scratch
+        diff, d, work = scratch['diff'], scratch['d'], scratch['work']
+        hits, at_nest = scratch['hits'], scratch['at_nest']
+
+        np.subtract(agent_pos[:, None, :], nest_pos[None, :, :], out=diff)
+        np.einsum('mkj,mkj->mk', diff, diff, out=d)
+        np.sqrt(d, out=d)
+
+        shares = np.asarray(search_shares, dtype=np.float64)
+
+        # Rejection form of the scalar test (see query_nest_composition):
+        # U < 1 - exp(-c*s/d) is equivalent to -log(1-U) * d < c*s, which
+        # needs no division and so no special-casing of d == 0 beyond the
+        # always-succeed override for agents standing on the nest
+        self.rng.random(out=work)
+        np.subtract(1.0, work, out=work)
+        np.log(work, out=work)
+        np.negative(work, out=work)
+        np.multiply(work, d, out=work)
+        np.less(work, SEARCH_COST * shares[:, None], out=hits)
+        np.equal(d, 0.0, out=at_nest)
+        np.logical_or(hits, at_nest, out=hits)
+
+        results: List[Tuple[int, NestView]] = []
+        for m, k in zip(*np.nonzero(hits)):
+            results.append((agent_ids[m], self._nest_view(self.nests[nest_ids[k]])))
+        return results
+
     def reset_resources(self) -> None:
         """
         Reset world resources using WorldGenerator.
@@ -182,10 +498,19 @@ class WorldState:
         """
         if self.grid_size <= 0:
             return
-        
-        # Use WorldGenerator to generate new resources with the same parameters as initialization
-        world_generator = WorldGenerator(GRID_SIZE, RESOURCE_LEVEL, AGGREGATION_LEVEL)
-        self.resource_grid = world_generator.generate_resources()
+
+        # Use WorldGenerator to generate new resources with the same parameters
+        # as initialization; built once and reused, drawing from the shared rng
+        if self._world_generator is None:
+            self._world_generator = WorldGenerator(GRID_SIZE, RESOURCE_LEVEL, AGGREGATION_LEVEL, self.rng)
+
+        # Regenerate into the existing grid buffer when shapes line up
+        out = self.resource_grid if self.resource_grid is not None \
+            and self.resource_grid.shape == (GRID_SIZE, GRID_SIZE) else None
+        self.resource_grid = self._world_generator.generate_resources(out=out)
+        self._nest_resource_cache.clear()
+        self._patch_fledgling_cache.clear()
+        self._agent_fitness_cache.clear()
     
     def clear_all_nest_resources(self) -> None:
         """
@@ -195,3 +520,6 @@ class WorldState:
         """
         for nest in self.nests.values():
             nest.reset_resources()
+        self._nest_resource_cache.clear()
+        self._patch_fledgling_cache.clear()
+        self._agent_fitness_cache.clear()